@@ -1,3 +1,3 @@
 @echo off
 cls
-python main.py %1 %2
\ No newline at end of file
+python main.py %1 %2 %3
\ No newline at end of file
@@ -3,4 +3,8 @@ MIN, NEG, NULL, POS, MAX = -2, -1, 0, 1, 2
 CONSTANTS_DICT = {"MIN": MIN, "NEG": NEG, "NULL" : NULL, "POS" : POS, "MAX": MAX}
 
 def readout_constants(constant_list):
-    return tuple([CONSTANTS_DICT[elem] for elem in constant_list])
\ No newline at end of file
+    return tuple([CONSTANTS_DICT[elem] for elem in constant_list])
+
+ENGINE_PYTHON, ENGINE_NUMBA = "python", "numba"
+
+ENGINES = (ENGINE_PYTHON, ENGINE_NUMBA)
@@ -27,9 +27,9 @@ def enforce_python_version():
             "\n\n####################\nMake sure correct version of python is installed (3.5 or higher)\n####################\n\n")
 
 
-def load_system(filename):
+def load_system(filename, engine=ENGINE_PYTHON):
     """
-    loads sysemt from file
+    loads sysemt from file, to be solved with the given engine
 
     :return:
     """
@@ -89,7 +89,7 @@ def load_system(filename):
         quantities_lookup[relation.quantity_from.name].set_outgoing_quantity_relation(relation)
         quantities_lookup[relation.quantity_to.name].set_incoming_quantity_relation(relation)
 
-    return QualitativeReasoning(entities, quantities, value_constraints)
+    return QualitativeReasoning(entities, quantities, value_constraints, engine=engine)
 
 
 def main():
@@ -107,8 +107,12 @@ def main():
         use_path = sys.argv[2]
     except:
         use_path = True
+    try:
+        engine = sys.argv[3]
+    except:
+        engine = ENGINE_PYTHON
 
-    system = load_system(filename)
+    system = load_system(filename, engine)
     graph, all_states, states_ordered = system.solve()
 
     start = {key: tuple(value) for key, value in json.loads(open("./data/start_state.json", "r").read()).items()}
@@ -12,11 +12,22 @@ class QualitativeReasoning:
     entities: List[Entity]
     quantities: List[Quantity]
 
-    def __init__(self, entities: List[Entity], quantities: List[Quantity], value_constraints: List[ValueConstraint]):
+    def __init__(self, entities: List[Entity], quantities: List[Quantity], value_constraints: List[ValueConstraint],
+                 engine: str = ENGINE_PYTHON):
+
+        if engine not in ENGINES:
+            raise Exception("unknown engine: " + engine)
+        if engine == ENGINE_NUMBA:
+            # only the compiled engine pays for importing numba
+            from model.kernels import NUMBA_AVAILABLE
+            if not NUMBA_AVAILABLE:
+                print("numba is not installed, falling back to the python engine")
+                engine = ENGINE_PYTHON
 
         self.entities = entities
         self.quantities = quantities
         self.value_constraints = value_constraints
+        self.engine = engine
         self.random_variables = []
 
         # keep track of which variables kan change derivative randomly
@@ -40,6 +51,9 @@ class QualitativeReasoning:
             possible_values.update(magnitudes)
             possible_values.update(derivatives)
 
+        if self.engine == ENGINE_NUMBA:
+            return self.solve_compiled(possible_values)
+
         # Build all possible states with all possible values they could potentially take
         # This is done by taking every possibility and then filtering out the non-sense ones.
         possibilities_matrix = list(product(possible_values, repeat=2 * len(self.quantities)))
@@ -58,6 +72,45 @@ class QualitativeReasoning:
 
         return graph, all_states, states_ordered
 
+    def solve_compiled(self, possible_values):
+        """
+        solves the QR system with the compiled kernels, yields the same states (in the same order) and edges as solve
+
+        :return:
+        """
+        from model.kernels import FlatModel, valid_entries_kernel, edges_kernel
+
+        flat = FlatModel(self.quantities, self.value_constraints, self.random_variables)
+
+        # Filter the same possibilities as solve, in the same order, without materializing them
+        values = np.array(list(possible_values), dtype=np.int64)
+        transfer_matrix = valid_entries_kernel(values, 2 * len(self.quantities), flat.magnitudes, flat.n_magnitudes,
+                                               flat.derivatives, flat.n_derivatives, flat.middle_derivative,
+                                               flat.relation_start, flat.relation_source, flat.relation_sign,
+                                               flat.relation_influence, flat.value_constraints)
+
+        states_ordered = []
+        for state in transfer_matrix.tolist():
+            states_ordered.append(State(self.quantities, [tuple((state[i * 2], state[i * 2 + 1])) for i in range(len(self.quantities))]))
+
+        # Same combinations of quantities as generate_graph, as masks over the quantities
+        name_product = [combi for z in range(1, 4) for combi in combinations(range(len(self.quantities)), z)]
+        combination_masks = np.zeros((len(name_product), len(self.quantities)), dtype=np.bool_)
+        for c, combi in enumerate(name_product):
+            combination_masks[c, list(combi)] = True
+
+        # Transitions only depend on the state itself, so a single pass finds every edge
+        edges = edges_kernel(transfer_matrix, combination_masks, flat.random_variables, flat.magnitudes,
+                             flat.n_magnitudes, flat.relation_start, flat.relation_source, flat.relation_sign,
+                             flat.relation_influence)
+
+        all_states = {state.id: state for state in states_ordered}
+        graph = {state.id: set() for state in states_ordered}
+        for index_from, index_to in edges.tolist():
+            graph[states_ordered[index_from].id].add(states_ordered[index_to].id)
+
+        return graph, all_states, states_ordered
+
 
 
     def is_valid(self, entry) -> bool:
@@ -0,0 +1,290 @@
+import numpy as np
+from model.classes import *
+from data.constants import *
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+    def njit(*args, **kwargs):
+        """ stand-in decorator so the kernels below still run as plain python without numba """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+# every value (magnitude or derivative) is a constant between MIN and MAX, so a state can be packed into one integer
+KEY_BASE = MAX - MIN + 1
+
+# returned by _relation_target when the incoming relations do not force a derivative
+UNCONSTRAINED = MAX + 1
+
+
+class FlatModel:
+    """ Flattened integer representation of a QR model, as consumed by the compiled kernels """
+    magnitudes: np.ndarray
+    derivatives: np.ndarray
+    relation_start: np.ndarray
+    value_constraints: np.ndarray
+
+    def __init__(self, quantities: List[Quantity], value_constraints: List[ValueConstraint],
+                 random_variables: List[str]):
+
+        n = len(quantities)
+        index_of = {quantity.name: i for i, quantity in enumerate(quantities)}
+
+        # domains, padded to the largest domain and accompanied by their lengths
+        max_magnitudes = max(len(quantity.possible_magnitudes) for quantity in quantities)
+        max_derivatives = max(len(quantity.possible_derivatives) for quantity in quantities)
+        self.magnitudes = np.zeros((n, max_magnitudes), dtype=np.int64)
+        self.n_magnitudes = np.zeros(n, dtype=np.int64)
+        self.derivatives = np.zeros((n, max_derivatives), dtype=np.int64)
+        self.n_derivatives = np.zeros(n, dtype=np.int64)
+        self.middle_derivative = np.zeros(n, dtype=np.int64)
+
+        for i, quantity in enumerate(quantities):
+            self.magnitudes[i, :len(quantity.possible_magnitudes)] = quantity.possible_magnitudes
+            self.n_magnitudes[i] = len(quantity.possible_magnitudes)
+            self.derivatives[i, :len(quantity.possible_derivatives)] = quantity.possible_derivatives
+            self.n_derivatives[i] = len(quantity.possible_derivatives)
+            try:
+                self.middle_derivative[i] = quantity.possible_derivatives.index(NULL)
+            except ValueError:
+                self.middle_derivative[i] = int(len(quantity.possible_derivatives) / 2)  # estimation
+
+        # incoming relations per quantity, stored as slices relation_start[i]:relation_start[i + 1]
+        sources, signs, influences = [], [], []
+        self.relation_start = np.zeros(n + 1, dtype=np.int64)
+        for i, quantity in enumerate(quantities):
+            for relation, quantity_from in quantity.incoming_quantity_relations:
+                sources.append(index_of[quantity_from.name])
+                signs.append(relation.sign)
+                influences.append(int(isinstance(relation, Influence)))
+            self.relation_start[i + 1] = len(sources)
+        self.relation_source = np.array(sources, dtype=np.int64)
+        self.relation_sign = np.array(signs, dtype=np.int64)
+        self.relation_influence = np.array(influences, dtype=np.int64)
+
+        # value constraints as (from, to) index pairs
+        self.value_constraints = np.array(
+            [(index_of[vc.quantity_from.name], index_of[vc.quantity_to.name]) for vc in value_constraints],
+            dtype=np.int64).reshape(-1, 2)
+
+        self.random_variables = np.array([index_of[name] for name in random_variables], dtype=np.int64)
+
+
+@njit(cache=True)
+def _index_of(domain, length, value):
+    for i in range(length):
+        if domain[i] == value:
+            return i
+    return -1
+
+
+@njit(cache=True)
+def _relation_target(entry, q, relation_start, relation_source, relation_sign, relation_influence):
+    """
+    Derivative forced on quantity q by its incoming influences and proportionals, or UNCONSTRAINED
+    """
+    # the sign set is tracked as flags
+    has_neg, has_pos, has_null, has_other = False, False, False, False
+    for r in range(relation_start[q], relation_start[q + 1]):
+        source = relation_source[r]
+        if relation_influence[r]:
+            sign = relation_sign[r] * int(entry[2 * source] != 0)
+        else:
+            sign = relation_sign[r] * entry[2 * source + 1]
+        if sign == NEG:
+            has_neg = True
+        elif sign == POS:
+            has_pos = True
+        elif sign == NULL:
+            has_null = True
+        else:
+            has_other = True
+
+    # If ambiguity
+    if has_neg and has_pos:
+        return UNCONSTRAINED
+    elif has_neg:
+        return NEG
+    elif has_pos:
+        return POS
+    elif has_null and not has_other:
+        return NULL
+    return UNCONSTRAINED
+
+
+@njit(cache=True)
+def is_valid_kernel(entry, magnitudes, n_magnitudes, derivatives, n_derivatives, middle_derivative,
+                    relation_start, relation_source, relation_sign, relation_influence, value_constraints):
+    """
+    Compiled counterpart of QualitativeReasoning.is_valid on a flat (magnitude, derivative, ...) entry
+    """
+    n = n_magnitudes.shape[0]
+    for q in range(n):
+        magnitude = entry[2 * q]
+        derivative = entry[2 * q + 1]
+
+        # wrong value assignments to columns in matrix
+        index_derivative = _index_of(derivatives[q], n_derivatives[q], derivative)
+        index_magnitude = _index_of(magnitudes[q], n_magnitudes[q], magnitude)
+        if index_derivative < 0 or index_magnitude < 0:
+            return False
+
+        # max or min situations
+        if magnitude == MAX and index_derivative > middle_derivative[q]:
+            return False
+        elif index_magnitude == 0 and index_derivative < middle_derivative[q]:
+            return False
+
+        # value constraints
+        for c in range(value_constraints.shape[0]):
+            if value_constraints[c, 0] == q:
+                other = value_constraints[c, 1]
+            elif value_constraints[c, 1] == q:
+                other = value_constraints[c, 0]
+            else:
+                continue
+            if magnitude != entry[2 * other]:
+                return False
+
+        # influences and proportionals
+        target = _relation_target(entry, q, relation_start, relation_source, relation_sign, relation_influence)
+        if target != UNCONSTRAINED and derivative != target:
+            return False
+
+    return True
+
+
+@njit(cache=True)
+def _decode(number, values, entry):
+    """ writes the number-th element of product(values, repeat=len(entry)) into entry """
+    n_values = values.shape[0]
+    for position in range(entry.shape[0] - 1, -1, -1):
+        entry[position] = values[number % n_values]
+        number //= n_values
+
+
+@njit(cache=True)
+def valid_entries_kernel(values, n_positions, magnitudes, n_magnitudes, derivatives, n_derivatives,
+                         middle_derivative, relation_start, relation_source, relation_sign, relation_influence,
+                         value_constraints):
+    """
+    Filters product(values, repeat=n_positions) through is_valid_kernel without materializing the product.
+    Two passes are made (count, then fill) so the result keeps the order of the product.
+    """
+    total = values.shape[0] ** n_positions
+    entry = np.zeros(n_positions, dtype=np.int64)
+
+    count = 0
+    for number in range(total):
+        _decode(number, values, entry)
+        if is_valid_kernel(entry, magnitudes, n_magnitudes, derivatives, n_derivatives, middle_derivative,
+                           relation_start, relation_source, relation_sign, relation_influence, value_constraints):
+            count += 1
+
+    result = np.zeros((count, n_positions), dtype=np.int64)
+    filled = 0
+    for number in range(total):
+        _decode(number, values, entry)
+        if is_valid_kernel(entry, magnitudes, n_magnitudes, derivatives, n_derivatives, middle_derivative,
+                           relation_start, relation_source, relation_sign, relation_influence, value_constraints):
+            result[filled, :] = entry
+            filled += 1
+
+    return result
+
+
+@njit(cache=True)
+def state_key(entry):
+    """ packs a flat state into a single integer """
+    key = 0
+    for position in range(entry.shape[0]):
+        key = key * KEY_BASE + (entry[position] - MIN)
+    return key
+
+
+@njit(cache=True)
+def apply_derivatives_kernel(entry, combination, magnitudes, n_magnitudes):
+    """
+    Compiled counterpart of QualitativeReasoning.apply_derivatives, combination is a boolean mask over quantities
+    """
+    for q in range(n_magnitudes.shape[0]):
+        if not combination[q]:
+            continue
+        index_new = _index_of(magnitudes[q], n_magnitudes[q], entry[2 * q]) + entry[2 * q + 1]
+        if index_new >= n_magnitudes[q]:
+            index_new = n_magnitudes[q] - 1
+        elif index_new < 0:
+            index_new = 0
+        entry[2 * q] = magnitudes[q, index_new]
+
+
+@njit(cache=True)
+def apply_relations_kernel(entry, relation_start, relation_source, relation_sign, relation_influence):
+    """
+    Compiled counterpart of QualitativeReasoning.appy_relations, updates derivatives in place in quantity order
+    """
+    for q in range(relation_start.shape[0] - 1):
+        target = _relation_target(entry, q, relation_start, relation_source, relation_sign, relation_influence)
+        if target != UNCONSTRAINED:
+            entry[2 * q + 1] = target
+
+
+@njit(cache=True)
+def edges_kernel(states, combinations, random_variables, magnitudes, n_magnitudes, relation_start,
+                 relation_source, relation_sign, relation_influence):
+    """
+    Compiled counterpart of the transition loop in QualitativeReasoning.generate_graph.
+    Returns (from, to) row indices into states, possibly with duplicates.
+    """
+    n_states = states.shape[0]
+    keys = np.zeros(n_states, dtype=np.int64)
+    for s in range(n_states):
+        keys[s] = state_key(states[s])
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+
+    edges = []
+    new_state = np.zeros(states.shape[1], dtype=np.int64)
+    for s in range(n_states):
+        for name in random_variables:
+            current_derivative = states[s, 2 * name + 1]
+            for c in range(combinations.shape[0]):
+                for possibility in range(NEG, POS + 1):
+                    if abs(possibility - current_derivative) >= 2:
+                        continue
+
+                    new_state[:] = states[s]
+
+                    # apply derivative
+                    apply_derivatives_kernel(new_state, combinations[c], magnitudes, n_magnitudes)
+
+                    # apply relations once
+                    apply_relations_kernel(new_state, relation_start, relation_source, relation_sign,
+                                           relation_influence)
+
+                    # see if random variables apply
+                    if combinations[c, name]:
+                        new_state[2 * name + 1] = possibility
+
+                    # see if valid edge
+                    key = state_key(new_state)
+                    position = np.searchsorted(sorted_keys, key)
+                    if position == n_states or sorted_keys[position] != key:
+                        continue
+                    target = order[position]
+                    if target == s:
+                        continue
+
+                    edges.append((s, target))
+
+    result = np.zeros((len(edges), 2), dtype=np.int64)
+    for e in range(len(edges)):
+        result[e, 0] = edges[e][0]
+        result[e, 1] = edges[e][1]
+    return result
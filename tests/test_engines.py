@@ -0,0 +1,58 @@
+import os
+import pytest
+
+pytest.importorskip("numba")
+
+from main import load_system
+from model.QualitativeReasoner import QualitativeReasoning
+from model.classes import *
+from data.constants import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def solve_both(build):
+    """ solves the system returned by build(engine) with both engines """
+    results = []
+    for engine in ENGINES:
+        system = build(engine)
+        assert system.engine == engine
+        graph, all_states, states_ordered = system.solve()
+        results.append((graph, [state.id for state in states_ordered]))
+    return results
+
+
+def relate(relation):
+    relation.quantity_from.set_outgoing_quantity_relation(relation)
+    relation.quantity_to.set_incoming_quantity_relation(relation)
+
+
+def build_tank(engine):
+    """ small model with several random variables, a value constraint, influences and a proportional """
+    tap = Quantity("tap", readout_constants(["NULL", "POS"]), randomized=True)
+    drain = Quantity("drain", readout_constants(["NULL", "POS", "MAX"]), randomized=True)
+    level = Quantity("level", readout_constants(["NULL", "POS", "MAX"]))
+
+    relate(Influence(True, tap, level))
+    relate(Influence(False, drain, level))
+    relate(Proportional(True, level, drain))
+
+    return QualitativeReasoning([Entity("tank")], [tap, drain, level],
+                                [ValueConstraint(True, level, drain)], engine=engine)
+
+
+def test_sink_problem_parity(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    (graph_python, states_python), (graph_numba, states_numba) = solve_both(
+        lambda engine: load_system("sink_problem", engine))
+
+    assert states_python == states_numba
+    assert graph_python == graph_numba
+
+
+def test_in_code_model_parity():
+    (graph_python, states_python), (graph_numba, states_numba) = solve_both(build_tank)
+
+    assert len(states_python) > 1 and any(graph_python.values())
+    assert states_python == states_numba
+    assert graph_python == graph_numba